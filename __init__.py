@@ -7,7 +7,7 @@ Depends:
     os, typing, numpy, pandas
 
 Suggests:
-    geopandas
+    geopandas, orjson（あればメタデータの読み込みに使う）
 
 例：
 
@@ -23,10 +23,10 @@ clean_gpd.head()
 #   準備
 # =============================================================================
 
-import codecs
-import itertools
+import functools
 import json
 import os
+import pickle
 from pathlib import Path
 from typing import Callable, Dict, Tuple, Union
 import warnings
@@ -34,6 +34,12 @@ import warnings
 import numpy
 import pandas
 
+# orjsonがあれば、速いのでそちらでJSONを読み込む。
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 from ._conv import G02
 
 __all__ = ["cleanup"]
@@ -47,30 +53,84 @@ __all__ = ["cleanup"]
 # デフォルトの列名リスト。
 _DEFAULT_COLNAME_FILE = "column_names.txt"
 
+# 対応している言語コード。
+_LANGUAGES = ("ja", "en")
+
+# 読み込んだメタデータのキャッシュ。{0}は言語コード。
+_METADATA_CACHE_FILE = ".meta_cache_{0}.pkl"
+
+# pandas 3以降は常にCopy-on-Writeが有効。
+_COPY_ON_WRITE = int(pandas.__version__.split(".")[0]) >= 3
+
 # 変換関数を読み込み。
 _CONVERT_FUNCTIONS = [
     [2012, G02.LATEST_YEAR, G02.convert]
 ]
 
+# 年ごとの変換関数。
+_CONVERT_BY_YEAR = {
+    str(year): [i[2] for i in _CONVERT_FUNCTIONS if i[0] == year]
+    for year, _, _ in _CONVERT_FUNCTIONS
+}
+
+# 年が指定されなかったときに使う変換関数。
+_DEFAULT_CONVERT = [
+    convert for year, latest_year, convert in _CONVERT_FUNCTIONS
+    if year == latest_year
+]
+
+
+# =============================================================================
+#   クラス定義
+# =============================================================================
+
+# -----------------------------------------------------------------------------
+class _LazyLanguageDict:
+    """
+    言語コードをキーとし、初めて参照されたときに値を作成する辞書。
+
+    使わない言語のデータを読み込まずに済ませるために使う。
+    """
+    def __init__(self, create: Callable[[str], object]):
+        """
+        Args:
+            create (Callable):
+                言語コードを受け取り、その言語の値を作成する関数。
+        """
+        self._create = create
+        self._data = {}
+
+    def __getitem__(self, language: str):
+        if language not in self._data:
+            if language not in _LANGUAGES:
+                raise KeyError(language)
+            self._data[language] = self._create(language)
+        return self._data[language]
+
 
 # =============================================================================
 #   関数定義
 # =============================================================================
 
 # -----------------------------------------------------------------------------
-def _convert_values(df: pandas.DataFrame, year: int) -> pandas.DataFrame:
+def _convert_values(
+    df: pandas.DataFrame, year: Union[int, str, None]
+) -> pandas.DataFrame:
     """
     データの値を変換する。
 
     Args:
         df (pandas.DataFrame):
             変換するデータ。
-        year (int):
+        year (int, str, None):
             変換するデータの年。
     """
-    for y, latest_year, convert in _CONVERT_FUNCTIONS:
-        if year == y or (year is None and y == latest_year):
-            df = convert(df)
+    if year is None:
+        functions = _DEFAULT_CONVERT
+    else:
+        functions = _CONVERT_BY_YEAR.get(str(year), [])
+    for convert in functions:
+        df = convert(df)
     return df
 
 
@@ -82,6 +142,34 @@ def _data_dir_path() -> Path:
     return Path(__file__).parent / "_data"
 
 
+#------------------------------------------------------------------------------
+@functools.lru_cache(maxsize = None)
+def _scan_data_tree() -> Dict[str, Dict[str, Tuple[str, ...]]]:
+    """
+    データディレクトリを一度だけ走査し、その構造を返す。
+
+    Returns:
+        dict:
+            {"識別子": {"列番号": ("ファイル名", ...)}}形式の辞書。
+    """
+    tree = {}
+    with os.scandir(_data_dir_path()) as data_entries:
+        for data_entry in data_entries:
+            if not data_entry.is_dir():
+                continue
+            columns = {}
+            with os.scandir(data_entry.path) as column_entries:
+                for column_entry in column_entries:
+                    if not column_entry.is_dir():
+                        continue
+                    with os.scandir(column_entry.path) as files:
+                        columns[column_entry.name] = tuple(
+                            sorted(i.name for i in files)
+                        )
+            tree[data_entry.name] = {i: columns[i] for i in sorted(columns)}
+    return {i: tree[i] for i in sorted(tree)}
+
+
 #------------------------------------------------------------------------------
 def _read_default_column_name_conversion_table() -> Tuple[Dict[str, str]]:
     """
@@ -94,9 +182,13 @@ def _read_default_column_name_conversion_table() -> Tuple[Dict[str, str]]:
             ただし、英語はまだほとんど実装していない。
     """
     path = _data_dir_path() / _DEFAULT_COLNAME_FILE
-    df = pandas.read_csv(path, encoding = "utf_8",  sep = "\t")
-    conv_ja = {key: value for key, value in zip(df["対応番号"], df["属性名"])}
-    conv_en = {key: value for key, value in zip(df["対応番号"], df["name"])}
+    df = pandas.read_csv(
+        path, encoding = "utf_8", sep = "\t", engine = "c",
+        usecols = ["対応番号", "属性名", "name"], dtype = str
+    )
+    keys = df["対応番号"].to_numpy()
+    conv_ja = dict(zip(keys, df["属性名"].to_numpy()))
+    conv_en = dict(zip(keys, df["name"].to_numpy()))
     return (conv_ja, conv_en)
 
 
@@ -117,6 +209,7 @@ def _metadata_dir_path(column_name: str) -> Path:
 
 
 #------------------------------------------------------------------------------
+@functools.lru_cache(maxsize = None)
 def _read_column_metadata(column_name: str, language: str) -> Dict[str, str]:
     """
     列名に対応するメタデータを読み込んで整形する。
@@ -138,7 +231,7 @@ def _read_column_metadata(column_name: str, language: str) -> Dict[str, str]:
     """
     # メタデータを読み込む。
     root_dir = _metadata_dir_path(column_name)
-    metadata = json.loads((root_dir / "meta.json").read_text("utf_8"))
+    metadata = _json_loads((root_dir / "meta.json").read_bytes())
     if language in metadata:
         metadata = metadata[language]
     else:
@@ -148,7 +241,8 @@ def _read_column_metadata(column_name: str, language: str) -> Dict[str, str]:
     metadata["latest_year"] = latest_year
     metadata["default_name"] = metadata[latest_year]
     # 変換テーブルの存在を確認。
-    files = sorted(root_dir.glob("*"))
+    data_name, column_number = column_name.split("_")
+    files = _scan_data_tree()[data_name][column_number]
     metadata["has_code_table"] = len(files) > 1
     return metadata
 
@@ -166,29 +260,119 @@ def _create_column_metadata_list(language: str) -> Dict[str, dict]:
         dict:
             {"列名": {列のメタデータ}}形式のメタデータの一覧。
     """
-    # 対応している国土数値情報の識別子一覧を作成する。
-    data_names = sorted(_data_dir_path().glob("*/"))
-    # サブフォルダを取得し、対応している列名の一覧を作成する。
-    subfolders = {i.name: [j.name for j in i.glob("*/")] for i in data_names}
+    # 対応している国土数値情報の識別子とサブフォルダを取得し、
+    # 対応している列名の一覧を作成する。
     column_names = [
-        list(itertools.product([k], v)) for k, v in subfolders.items()
+        f"{k}_{v}" for k, vs in _scan_data_tree().items() for v in vs
     ]
-    column_names = list(itertools.chain.from_iterable(column_names))
-    column_names = ["{0}_{1}".format(*i) for i in column_names]
     # 列のメタデータを読み込む。
     metadata = {
-        i: _read_column_metadata(i, language) for i in column_names
-        if _read_column_metadata(i, language) is not None
+        i: m for i in column_names
+        if (m := _read_column_metadata(i, language)) is not None
     }
     return metadata
 
 
 #------------------------------------------------------------------------------
+def _create_code_table_year_list(language: str) -> Dict[str, Tuple[str, ...]]:
+    """
+    コード変換表が存在する列と、変換表の年の一覧を作成する。
+
+    Args:
+        language (str):
+            言語コード。
+
+    Returns:
+        dict:
+            {"列名": ("年", ...)}形式の辞書。
+            年は古い順に並んでいる。
+    """
+    tree = _scan_data_tree()
+    years = {}
+    for column_name in _COLUMN_LIST[language]:
+        data_name, column_number = column_name.split("_")
+        files = tree[data_name][column_number]
+        code_years = [i[:-4] for i in files if i.endswith(".txt")]
+        if code_years:
+            years[column_name] = tuple(sorted(code_years, key = int))
+    return years
+
+
+#------------------------------------------------------------------------------
+def _metadata_mtime() -> float:
+    """
+    メタデータのファイルの最終更新時刻のうち、最も新しいものを返す。
+    """
+    data_dir = _data_dir_path()
+    paths = [data_dir / _DEFAULT_COLNAME_FILE]
+    for data_name, columns in _scan_data_tree().items():
+        paths.extend(
+            data_dir / data_name / i / "meta.json" for i in columns
+        )
+    return max(os.stat(i).st_mtime for i in paths)
+
+
+#------------------------------------------------------------------------------
+@functools.lru_cache(maxsize = None)
+def _load_or_build_metadata(language: str) -> Tuple[dict, dict]:
+    """
+    列名のメタデータとデフォルトの列名変換テーブルを読み込む。
+
+    データディレクトリの構造とメタデータの更新時刻が前回と同じなら、
+    JSONを読まずにキャッシュから読み込む。
+    そうでなければメタデータを作成し、キャッシュに書き出す。
+
+    Args:
+        language (str):
+            言語コード。
+
+    Returns:
+        dict, dict:
+            {"列名": {列のメタデータ}}形式のメタデータと、
+            {"国土数値情報列名コード": "列名"}形式の列名変換テーブル。
+    """
+    key = (_scan_data_tree(), _metadata_mtime())
+    path = _data_dir_path() / _METADATA_CACHE_FILE.format(language)
+    # 壊れていたり形式が違ったりするキャッシュは、無いものとして作り直す。
+    try:
+        with open(path, "rb") as f:
+            cached_key, data = pickle.load(f)
+        column_list, default_columns = data
+        if cached_key == key and isinstance(column_list, dict) \
+                and isinstance(default_columns, dict):
+            return data
+    except Exception:
+        pass
+    default_columns = _read_default_column_name_conversion_table()
+    data = (
+        _create_column_metadata_list(language),
+        default_columns[_LANGUAGES.index(language)]
+    )
+    # 書き込めない場所にインストールされていてもそのまま使えるようにする。
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            pickle.dump((key, data), f)
+        os.replace(temp_path, path)
+    except (OSError, pickle.PickleError):
+        pass
+    finally:
+        # 書き込みに失敗した一時ファイルを残さない。
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+    return data
+
+
+#------------------------------------------------------------------------------
+@functools.lru_cache(maxsize = None)
 def _read_codelist_file(
    column_name: str, year: Union[int, str, None], language: str
 ) -> Union[None, Dict[int, str]]:
     """
     コードとデータの変換表を読み込む。
+    読み込んだ変換表は列名、年、言語コードごとにキャッシュされる。
 
     Args:
         column_name (str):
@@ -211,44 +395,12 @@ def _read_codelist_file(
         return
     year = column_list[column_name]["latest_year"] if year is None else year
     path = _metadata_dir_path(column_name) / f"{year}.txt"
-    codelist = pandas.read_csv(path, sep = "\t", encoding = "utf_8")
-    return {code: data for code, data in zip(codelist.code, codelist.data)}
-
-
-# -----------------------------------------------------------------------------
-def _create_cached_code_list_fun() -> Callable:
-    """
-    キャッシュ機能付きの国土数値情報のコード変換表読み込み関数を作成する。
-    """
-    # キャッシュを準備。
-    cache = {}
-    def read_code_list(
-        column_name: str, year: Union[int, str, None], language: str
-    ) -> dict:
-        """
-        国土数値情報のコード変換表を読み込む。
-
-        Args:
-            column_name (str):
-                対応表を読み込む列名。
-            year (int, str, None):
-                データの年。
-
-        Returns:
-            dict:
-                {code: 対応する値}形式の辞書。
-        """
-        key = "{0}-{1}".format(column_name, str(year))
-        if key in cache:
-            return cache[key]
-        code_dict = _read_codelist_file(column_name, year, language)
-        if code_dict is not None:
-            cache[key] = code_dict
-        return code_dict
-    return read_code_list
-
-# 読み込み関数を作成。
-_read_codelist = _create_cached_code_list_fun()
+    # コードは数値と文字列の両方があるので、型は推定させる。
+    codelist = pandas.read_csv(
+        path, sep = "\t", encoding = "utf_8", engine = "c",
+        usecols = ["code", "data"], dtype = {"data": str}
+    )
+    return dict(zip(codelist["code"].to_numpy(), codelist["data"].to_numpy()))
 
 
 # -----------------------------------------------------------------------------
@@ -269,17 +421,53 @@ def _convert_code(
         DataFrame:
             変換済みのデータ。
     """
-    for i in df.columns:
-        code_dict = _read_codelist(i, year, language)
+    # 変換表のある列だけを先に選び出しておく。
+    code_years = _CODE_TABLE_YEARS[language]
+    convertible = [i for i in df.columns if i in code_years]
+    for i in convertible:
+        years = code_years[i]
+        code_year = years[-1] if year is None else str(year)
+        if code_year not in years:
+            warnings.warn(
+                "Specified year not found in the code tables.\n"
+                "Latest code table was used for '{0}'.".format(i)
+            )
+            code_year = years[-1]
+        code_dict = _read_codelist_file(i, code_year, language)
         if code_dict is None:
             continue
-        df[i] = [
-            code_dict[code] if code in code_dict else pandas.NA
-            for code in df[i]
-        ]
+        # map()は変換表に無いコードをNaNにするので、以前と同じくpandas.NAにする。
+        df[i] = df[i].map(code_dict).to_numpy(
+            dtype = object, na_value = pandas.NA
+        )
     return df
 
 
+# -----------------------------------------------------------------------------
+def _create_column_name_list(
+    language: str
+) -> Dict[Tuple[str, Union[str, None]], str]:
+    """
+    列名コードと年から列名を直接引ける一覧を作成する。
+
+    Args:
+        language (str):
+            言語コード。
+
+    Returns:
+        dict:
+            {("列名コード", "年"): "列名"}形式の辞書。
+            年がNoneの要素にはデフォルトの（最新データの）列名が入る。
+    """
+    names = {}
+    for column_name, metadata in _COLUMN_LIST[language].items():
+        names[(column_name, None)] = metadata["default_name"]
+        for key, value in metadata.items():
+            if key.isdigit():
+                names[(column_name, key)] = value
+    return names
+
+
 # -----------------------------------------------------------------------------
 def _find_column_name_from_data_dir(
     column_name: str, year: Union[int, str, None], language: str
@@ -300,18 +488,17 @@ def _find_column_name_from_data_dir(
             変換した列名。
             変換する物が見つからない場合、元の列名（コード）を返す。
     """
-    column_list = _COLUMN_LIST[language]
-    if not column_name in column_list:
+    names = _COLUMN_NAMES[language]
+    key = (column_name, None if year is None else str(year))
+    if key in names:
+        return names[key]
+    if (column_name, None) not in names:
         return column_name
-    if year is None:
-        return column_list[column_name]["default_name"]
-    if str(year) not in column_list[column_name]:
-        warnings.warn(
-            "Specified year not found in the data.\n"
-            "Default column name was used for '{0}'.".format(column_name)
-        )
-        return column_list[column_name]["default_name"]
-    return column_list[column_name][str(year)]
+    warnings.warn(
+        "Specified year not found in the data.\n"
+        "Default column name was used for '{0}'.".format(column_name)
+    )
+    return names[(column_name, None)]
 
 
 # -----------------------------------------------------------------------------
@@ -339,10 +526,15 @@ def _rename_columns(
     """
     # まずはちゃんとしたデータがある方のデータを使い、
     # データが見つからなかったときに一覧のデータを使う。
-    df.columns = [
-        _find_column_name_from_data_dir(i, year, language) for i in df.columns
-    ]
-    df.columns = [conv_table[i] if i in conv_table else i for i in df.columns]
+    # 変換前後の対応表を一度に作成し、列名の変更は一回で済ませる。
+    mapping = {}
+    for i in df.columns:
+        name = _find_column_name_from_data_dir(i, year, language)
+        name = conv_table.get(name, name)
+        if name != i:
+            mapping[i] = name
+    if mapping:
+        df.rename(columns = mapping, inplace = True)
     return df
 
 
@@ -350,17 +542,19 @@ def _rename_columns(
 #   データ準備
 # =============================================================================
 
+# どれも言語ごとに、初めて使われたときに読み込む。
+
 # 列名のメタデータ
-_COLUMN_LIST = {
-    "ja": _create_column_metadata_list("ja"),
-    "en": _create_column_metadata_list("en")
-}
+_COLUMN_LIST = _LazyLanguageDict(lambda i: _load_or_build_metadata(i)[0])
 
 # デフォルトの列名変換テーブル
-_DEFAULT_COLUMNS = {
-    lang: data for lang, data in
-    zip(["ja", "en"], _read_default_column_name_conversion_table())
-}
+_DEFAULT_COLUMNS = _LazyLanguageDict(lambda i: _load_or_build_metadata(i)[1])
+
+# 列名コードと年に対応する列名
+_COLUMN_NAMES = _LazyLanguageDict(_create_column_name_list)
+
+# コード変換表が存在する列と年
+_CODE_TABLE_YEARS = _LazyLanguageDict(_create_code_table_year_list)
 
 
 # =============================================================================
@@ -384,6 +578,10 @@ def cleanup(
             指定しない場合、データに存在する最新の列名が使われる。
         inplace (bool):
             Trueならコピーを作成せずにデータを書き換える。
+            Falseなら返り値のデータを書き換えても元のデータは変わらない。
+            pandas 3未満では元のデータを深いコピーする。
+            pandas 3以降はCopy-on-Writeが有効なので、浅いコピーを作り、
+            書き換えられるまで変換しなかった列の配列を元のデータと共有する。
         language (str):
             列名の言語。
             "ja"と"en"に対応。ただし、"en"はほとんどまだ実装していない。
@@ -391,8 +589,9 @@ def cleanup(
     Value (pandas.DataFrame):
         inplaceがFalseなら整形したデータを返す。
     """
+    # Copy-on-Writeが有効なら、列のデータは書き換えられるまでコピーしない。
     if not inplace:
-        df = df.copy()
+        df = df.copy(deep = not _COPY_ON_WRITE)
     df = _convert_values(df, year)
     df = _convert_code(df, year, language)
     df = _rename_columns(df, year, _DEFAULT_COLUMNS[language], language)
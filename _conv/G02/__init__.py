@@ -2,6 +2,11 @@ import pandas
 
 LATEST_YEAR = 2012
 
+# 10で割る必要のある列名。
+_NAMES = [
+    "G02_{0:03}".format(i) for i in (*range(2, 54), *range(59, 85))
+]
+
 def convert(df: pandas.DataFrame):
     """
     メッシュ気候値用の変換関数。
@@ -10,9 +15,7 @@ def convert(df: pandas.DataFrame):
         df (DataFrame):
             変換処理をするデータフレーム。
     """
-    names = ["G02_{0:03}".format(i) for i in range(2, 54)]
-    names.extend(["G02_{0:03}".format(i) for i in range(59, 85)])
-    for i in names:
+    for i in _NAMES:
         if i in df:
             df[i] = df[i] / 10
     return df